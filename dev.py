@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
+import os
 import platform
 import shutil
 import subprocess
 import sys
+import threading
 import time
 
-from datetime import datetime, timedelta
 from importlib.util import find_spec
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, Sequence
+from typing import TYPE_CHECKING, Any, Sequence
+
+if TYPE_CHECKING:
+	from watchdog.events import FileSystemEvent
 
 try:
 	import tomllib
@@ -31,9 +37,6 @@ if None in [find_spec("click"), find_spec("watchdog")]:
 
 import click
 
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEvent, PatternMatchingEventHandler
-
 
 REPO = Path(__file__).parent
 IGNORE_EXT = {
@@ -54,9 +57,19 @@ def cli_install(no_dev: bool) -> None:
 		data = tomllib.loads(fd.read())
 
 	deps = data["project"]["dependencies"]
-	deps.extend(data["project"]["optional-dependencies"]["dev"])
 
-	subprocess.run([sys.executable, "-m", "pip", "install", "-U", *deps], check = False)
+	if not no_dev:
+		deps.extend(data["project"]["optional-dependencies"]["dev"])
+
+	cmd = [sys.executable, "-m", "pip", "install", "-U", *deps]
+
+	# pip is the last thing this command does, so replace the process instead
+	# of forking and sitting around waiting for it (windows can't truly exec)
+	if platform.system() == "Windows":
+		subprocess.run(cmd, check = False)
+		return
+
+	os.execvp(cmd[0], cmd)
 
 
 @cli.command("lint")
@@ -70,14 +83,25 @@ def cli_lint(path: Path, watch: bool) -> None:
 		handle_run_watcher([sys.executable, "dev.py", "lint", str(path)], wait = True)
 		return
 
-	flake8 = [sys.executable, "-m", "flake8", "dev.py", str(path)]
-	mypy = [sys.executable, "-m", "mypy", "--python-version", "3.12", "dev.py", str(path)]
+	flake8_cmd = [sys.executable, "-m", "flake8", "dev.py", str(path)]
+	mypy_cmd = [sys.executable, "-m", "mypy", "--python-version", "3.12", "dev.py", str(path)]
+
+	# run both linters at once and print their output after, so mypy (the slow
+	# one) doesn't have to wait for flake8 to finish
+	flake8 = subprocess.Popen(flake8_cmd, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+	mypy = subprocess.Popen(mypy_cmd, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+
+	flake8_out = flake8.communicate()[0]
+	mypy_out = mypy.communicate()[0]
 
 	click.echo("----- flake8 -----")
-	subprocess.run(flake8)
+	click.echo(flake8_out.decode("utf-8"))
 
 	click.echo("\n\n----- mypy -----")
-	subprocess.run(mypy)
+	click.echo(mypy_out.decode("utf-8"))
+
+	if (returncode := max(flake8.returncode, mypy.returncode)) != 0:
+		sys.exit(returncode)
 
 
 @cli.command("clean")
@@ -146,6 +170,9 @@ def handle_run_watcher(
 					watch_path: Path | str = REPO,
 					wait: bool = False) -> None:
 
+	# only the watcher commands need watchdog, so don't import it at module load
+	from watchdog.observers import Observer
+
 	handler = WatchHandler(*commands, wait = wait)
 	handler.run_procs()
 
@@ -165,20 +192,22 @@ def handle_run_watcher(
 	watcher.join()
 
 
-class WatchHandler(PatternMatchingEventHandler):
-	patterns = ["*.py"]
-
+class WatchHandler:
+	# watchdog only requires a dispatch method, so skip the event handler
+	# base classes and their import cost
 
 	def __init__(self, *commands: Sequence[str], wait: bool = False) -> None:
-		PatternMatchingEventHandler.__init__(self)
-
 		self.commands: Sequence[Sequence[str]] = commands
 		self.wait: bool = wait
 		self.procs: list[subprocess.Popen[Any]] = []
-		self.last_restart: datetime = datetime.now()
+		self.last_restart: float = 0.0
+		self.restart_timer: threading.Timer | None = None
 
 
 	def kill_procs(self) -> None:
+		if self.restart_timer is not None:
+			self.restart_timer.cancel()
+
 		for proc in self.procs:
 			if proc.poll() is not None:
 				continue
@@ -201,12 +230,12 @@ class WatchHandler(PatternMatchingEventHandler):
 
 	def run_procs(self, restart: bool = False) -> None:
 		if restart:
-			if datetime.now() - timedelta(seconds = 3) < self.last_restart:
+			if time.monotonic() - self.last_restart < 3:
 				return
 
 			self.kill_procs()
 
-		self.last_restart = datetime.now()
+		self.last_restart = time.monotonic()
 
 		if self.wait:
 			self.procs = []
@@ -221,11 +250,26 @@ class WatchHandler(PatternMatchingEventHandler):
 			print("Started processes with PIDs:", ", ".join(pids))
 
 
+	def dispatch(self, event: FileSystemEvent) -> None:
+		# skip watchdog's fnmatch machinery; a tail comparison is all we need
+		if event.is_directory or not str(event.src_path).endswith(".py"):
+			return
+
+		self.on_any_event(event)
+
+
 	def on_any_event(self, event: FileSystemEvent) -> None:
 		if event.event_type not in ["modified", "created", "deleted"]:
 			return
 
-		self.run_procs(restart = True)
+		# editors and checkouts fire bursts of events, so coalesce them into
+		# a single restart
+		if self.restart_timer is not None:
+			self.restart_timer.cancel()
+
+		self.restart_timer = threading.Timer(0.2, self.run_procs, kwargs = {"restart": True})
+		self.restart_timer.daemon = True
+		self.restart_timer.start()
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import os
+import time
 
 from abc import ABC, abstractmethod
 from blib import Date, convert_to_boolean
@@ -75,6 +76,10 @@ class Item:
 		if self.updated.tzinfo is None:
 			self.updated = self.updated.replace(tzinfo = timezone.utc)
 
+		# freshness checks happen on every cached request, so stash the float
+		# timestamp once and let older_than be a plain number compare
+		self._updated_ts: float = self.updated.timestamp()
+
 
 	@classmethod
 	def from_data(cls: type[Item], *args: Any) -> Item:
@@ -85,7 +90,7 @@ class Item:
 
 
 	def older_than(self, hours: int) -> bool:
-		return self.updated + timedelta(hours = hours) < Date.new_utc()
+		return self._updated_ts + hours * 3600 < time.time()
 
 
 	def to_dict(self) -> dict[str, Any]:
@@ -263,8 +268,11 @@ class SqlCache(Cache):
 		if self._db and self._db.connected:
 			return
 
-		self._db = get_database(self.state)
-		self._db.connect()
+		# cache calls happen while request handlers are still holding sessions
+		# from the main pool, so sharing that pool means acquiring a second
+		# connection under bsql's session lock and starving the event loop once
+		# enough requests are in flight; keep a separate pool for the cache
+		self._db = get_database(self.state, migrate = False)
 
 		with self._db.session(True) as conn:
 			with conn.run(f"create-cache-table-{self._db.backend_type.value}", None):
@@ -272,7 +280,7 @@ class SqlCache(Cache):
 
 
 	def close(self) -> None:
-		if not self._db:
+		if self._db is None:
 			return
 
 		self._db.disconnect()
@@ -381,7 +389,19 @@ class RedisCache(Cache):
 		if self._rd is None:
 			raise ConnectionError("Not connected")
 
-		self._rd.delete(f"{self.prefix}:*")
+		# delete() takes literal keys, so passing a glob never matched anything;
+		# scan for the prefixed keys and delete them in batches
+		keys = []
+
+		for key in self._rd.scan_iter(f"{self.prefix}:*"):
+			keys.append(key)
+
+			if len(keys) >= 500:
+				self._rd.delete(*keys)
+				keys.clear()
+
+		if keys:
+			self._rd.delete(*keys)
 
 
 	def setup(self) -> None:
@@ -9,11 +9,13 @@ import multiprocessing
 from blib import File
 from collections.abc import Callable
 from functools import update_wrapper
-from typing import Concatenate, ParamSpec, TypeVar
+from typing import TYPE_CHECKING, Concatenate, ParamSpec, TypeVar
 
 from .. import __version__
 from ..misc import IS_DOCKER
-from ..state import State
+
+if TYPE_CHECKING:
+	from ..state import State
 
 
 try:
@@ -32,6 +34,9 @@ R = TypeVar("R")
 @click.option("--config", "-c", type = File, help = "path to the relay config")
 @click.version_option(version = __version__, prog_name = "ActivityRelay")
 def cli(config: File | None) -> None:
+	# defer pulling in the web stack so --help and --version stay snappy
+	from ..state import State
+
 	if IS_DOCKER:
 		config = File("/data/relay.yaml")
 
@@ -52,6 +57,8 @@ def cli(config: File | None) -> None:
 
 def pass_state(func: Callable[Concatenate[State, P], R]) -> Callable[P, R]:
 	def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+		from ..state import State
+
 		if inspect.iscoroutinefunction(func):
 			return asyncio.run(func(State.default(), *args, **kwargs)) # type: ignore[no-any-return]
 
@@ -1,11 +1,15 @@
+from __future__ import annotations
+
 import click
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from . import cli, pass_state
 
 from ..misc import RELAY_SOFTWARE
-from ..state import State
+
+if TYPE_CHECKING:
+	from ..state import State
 
 
 @cli.group("ban")
@@ -1,9 +1,12 @@
+from __future__ import annotations
+
 import aputils
 import asyncio
 import click
 
 from blib import File
 from shutil import copyfile
+from typing import TYPE_CHECKING
 
 from . import cli, pass_state
 
@@ -12,7 +15,9 @@ from ..compat import RelayConfig, RelayDatabase
 from ..config import Config
 from ..database import TABLES, get_database
 from ..misc import IS_DOCKER, RELAY_SOFTWARE
-from ..state import State
+
+if TYPE_CHECKING:
+	from ..state import State
 
 
 def check_alphanumeric(text: str) -> str:
@@ -84,11 +89,10 @@ def cli_convert(state: State, old_config: str) -> None:
 				width = 0
 			) as banned_software:
 
-				for software in banned_software:
-					conn.put_software_ban(
-						software,
-						reason = "relay" if software in RELAY_SOFTWARE else None
-					)
+				conn.put_software_bans(
+					(software, "relay" if software in RELAY_SOFTWARE else None, None)
+					for software in banned_software
+				)
 
 			with click.progressbar(
 				config.get("blocked_instances", []),
@@ -96,8 +100,7 @@ def cli_convert(state: State, old_config: str) -> None:
 				width = 0
 			) as banned_software:
 
-				for domain in banned_software:
-					conn.put_domain_ban(domain)
+				conn.put_domain_bans((domain, None, None) for domain in banned_software)
 
 			with click.progressbar(
 				config.get("whitelist", []),
@@ -105,8 +108,7 @@ def cli_convert(state: State, old_config: str) -> None:
 				width = 0
 			) as whitelist:
 
-				for instance in whitelist:
-					conn.put_domain_whitelist(instance)
+				conn.put_domain_whitelists(whitelist)
 
 	click.echo("Finished converting old config and database :3")
 
@@ -284,6 +286,8 @@ def cli_switchbackend(state: State) -> None:
 		the database in postgresql already exists.
 	"""
 
+	from ..state import State
+
 	new_state = State(state.config.path, False)
 	new_state.config.db_type = "sqlite" if new_state.config.db_type == "postgres" else "postgres"
 	new_state.database = get_database(new_state, False)
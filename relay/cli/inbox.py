@@ -1,12 +1,17 @@
+from __future__ import annotations
+
 import click
 
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
 from . import cli, pass_state
 
 from ..database.schema import Instance
 from ..misc import ACTOR_FORMATS, Message
-from ..state import State
+
+if TYPE_CHECKING:
+	from ..state import State
 
 
 @cli.group("inbox")
@@ -1,8 +1,13 @@
+from __future__ import annotations
+
 import click
 
+from typing import TYPE_CHECKING
+
 from . import cli, pass_state
 
-from ..state import State
+if TYPE_CHECKING:
+	from ..state import State
 
 
 # remove this in 0.4.0
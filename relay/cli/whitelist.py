@@ -1,9 +1,15 @@
+from __future__ import annotations
+
 import click
 
+from typing import TYPE_CHECKING
+
 from . import cli, pass_state
 
 from ..database.schema import Whitelist
-from ..state import State
+
+if TYPE_CHECKING:
+	from ..state import State
 
 
 @cli.group("whitelist")
@@ -63,11 +69,17 @@ def cli_whitelist_import(state: State) -> None:
 	"Add all current instances to the whitelist"
 
 	with state.database.session() as conn:
+		existing = {row.domain for row in conn.execute("SELECT * FROM whitelist").all(Whitelist)}
+		domains = []
+
 		for row in conn.get_inboxes():
-			if conn.get_domain_whitelist(row.domain) is not None:
+			if row.domain in existing:
 				click.echo(f"Domain already in whitelist: {row.domain}")
 				continue
 
-			conn.put_domain_whitelist(row.domain)
+			domains.append(row.domain)
+
+		if domains:
+			conn.put_domain_whitelists(domains)
 
 		click.echo("Imported whitelist from inboxes")
@@ -24,9 +24,24 @@ SELECT * FROM inboxes WHERE domain = :value or inbox = :value or actor = :value;
 
 -- name: put-inbox
 INSERT INTO inboxes (domain, actor, inbox, followid, software, accepted, created)
-VALUES (:domain, :actor, :inbox, :followid, :software, :accepted, :created)
+VALUES (
+	:domain,
+	:actor,
+	-- not null constraints get checked before conflict resolution, so fill in
+	-- the stored inbox when updating without one
+	COALESCE(:inbox, (SELECT inbox FROM inboxes WHERE domain = :domain)),
+	:followid,
+	:software,
+	:accepted,
+	:created
+)
 ON CONFLICT (domain) DO
-UPDATE SET followid = :followid, inbox = :inbox, software = :software, created = :created
+UPDATE SET
+	actor = COALESCE(excluded.actor, inboxes.actor),
+	inbox = excluded.inbox,
+	followid = COALESCE(excluded.followid, inboxes.followid),
+	software = COALESCE(excluded.software, inboxes.software),
+	accepted = excluded.accepted
 RETURNING *;
 
 
@@ -36,7 +51,8 @@ UPDATE inboxes SET accepted = :accepted WHERE domain = :domain RETURNING *;
 
 -- name: del-inbox
 DELETE FROM inboxes
-WHERE domain = :value or inbox = :value or actor = :value;
+WHERE domain = :value or inbox = :value or actor = :value
+RETURNING 1;
 
 
 -- name: get-request
@@ -91,10 +107,6 @@ DELETE FROM apps
 WHERE client_id = :id and client_secret = :secret and token = :token;
 
 
--- name: del-token-user
-DELETE FROM apps WHERE "user" = :username;
-
-
 -- name: get-software-ban
 SELECT * FROM software_bans WHERE name = :name;
 
@@ -105,9 +117,15 @@ VALUES (:name, :reason, :note, :created)
 RETURNING *;
 
 
+-- name: put-software-ban-many
+INSERT INTO software_bans (name, reason, note, created)
+VALUES (:name, :reason, :note, :created);
+
+
 -- name: del-software-ban
 DELETE FROM software_bans
-WHERE name = :name;
+WHERE name = :name
+RETURNING 1;
 
 
 -- name: get-domain-ban
@@ -120,9 +138,15 @@ VALUES (:domain, :reason, :note, :created)
 RETURNING *;
 
 
+-- name: put-domain-ban-many
+INSERT INTO domain_bans (domain, reason, note, created)
+VALUES (:domain, :reason, :note, :created);
+
+
 -- name: del-domain-ban
 DELETE FROM domain_bans
-WHERE domain = :domain;
+WHERE domain = :domain
+RETURNING 1;
 
 
 -- name: get-domain-whitelist
@@ -135,9 +159,15 @@ VALUES (:domain, :created)
 RETURNING *;
 
 
+-- name: put-domain-whitelist-many
+INSERT INTO whitelist (domain, created)
+VALUES (:domain, :created);
+
+
 -- name: del-domain-whitelist
 DELETE FROM whitelist
-WHERE domain = :domain;
+WHERE domain = :domain
+RETURNING 1;
 
 
 -- cache functions --
@@ -61,7 +61,8 @@ def get_database(state: State, migrate: bool = True) -> Database[Connection]:
 		elif (schema_ver := conn.get_config("schema-version")) < ConfigData.DEFAULT("schema-version"):
 			logging.info("Migrating database from version '%i'", schema_ver)
 
-			for ver, func in VERSIONS.items():
+			# run in version order regardless of registration order
+			for ver, func in sorted(VERSIONS.items()):
 				if schema_ver < ver:
 					func(conn)
 					conn.put_config("schema-version", ver)
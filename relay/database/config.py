@@ -5,7 +5,7 @@ from __future__ import annotations
 from blib import convert_to_boolean
 from bsql import Row
 from collections.abc import Callable, Sequence
-from dataclasses import Field, asdict, dataclass, fields
+from dataclasses import Field, asdict, dataclass
 from typing import TYPE_CHECKING, Any
 
 from .. import logger as logging
@@ -77,7 +77,7 @@ CONFIG_CONVERT: dict[str, tuple[Callable[[Any], str], Callable[[str], Any]]] = {
 
 @dataclass()
 class ConfigData:
-	schema_version: int = 20240625
+	schema_version: int = 20250902
 	private_key: str = ""
 	approval_required: bool = False
 	log_level: logging.LogLevel = logging.LogLevel.INFO
@@ -120,13 +120,11 @@ class ConfigData:
 
 	@classmethod
 	def FIELD(cls: type[Self], key: str) -> Field[str | int | bool]:
-		parsed_key = key.replace("-", "_")
+		try:
+			return cls.__dataclass_fields__[key.replace("-", "_")]
 
-		for field in fields(cls):
-			if field.name == parsed_key:
-				return field
-
-		raise KeyError(key)
+		except KeyError:
+			raise KeyError(key) from None
 
 
 	@classmethod
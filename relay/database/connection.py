@@ -4,8 +4,8 @@ import secrets
 
 from argon2 import PasswordHasher
 from blib import Date, convert_to_boolean
-from bsql import BackendType, Connection as SqlConnection, Row, Update
-from collections.abc import Iterator
+from bsql import BackendType, Connection as SqlConnection, Database, Update
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any
 from urllib.parse import urlparse
@@ -23,24 +23,56 @@ if TYPE_CHECKING:
 	from ..state import State
 
 
+SQLITE_PRAGMAS = (
+	"foreign_keys = ON",
+	"journal_mode = WAL",
+	"synchronous = NORMAL",
+	"temp_store = MEMORY",
+	"cache_size = -64000"
+)
+
+
 class Connection(SqlConnection):
 	hasher = PasswordHasher(
 		encoding = "utf-8"
 	)
 
+	def __init__(self, database: Database[SqlConnection], start_trans: bool = False) -> None:
+		SqlConnection.__init__(self, database, start_trans)
+		self.setup_session()
+
+
 	@property
 	def state(self) -> State:
 		return get_state()
 
 
+	def connect(self) -> None:
+		SqlConnection.connect(self)
+		self.setup_session()
+
+
+	def setup_session(self) -> None:
+		if self.database.backend.backend_type == BackendType.SQLITE:
+			for pragma in SQLITE_PRAGMAS:
+				self.execute(f"PRAGMA {pragma}").close()
+
+
 	def distill_inboxes(self, message: Message) -> Iterator[schema.Instance]:
-		src_domains = {
-			message.domain,
-			urlparse(message.object_id).netloc
-		}
+		# the source is at most two domains, so compare directly instead of
+		# probing a set for every inbox
+		actor_domain = message.domain
+		object_domain = urlparse(message.object_id).netloc
+
+		if actor_domain == object_domain:
+			for instance in self.get_inboxes():
+				if instance.domain != actor_domain:
+					yield instance
+
+			return
 
 		for instance in self.get_inboxes():
-			if instance.domain not in src_domains:
+			if instance.domain != actor_domain and instance.domain != object_domain:
 				yield instance
 
 
@@ -89,7 +121,7 @@ class Connection(SqlConnection):
 		key = key.replace("_", "-")
 
 		with self.run("get-config", {"key": key}) as cur:
-			if (row := cur.one(Row)) is None:
+			if (row := cur.one(schema.Row)) is None:
 				return ConfigData.DEFAULT(key)
 
 		data = ConfigData()
@@ -140,6 +172,9 @@ class Connection(SqlConnection):
 
 
 	def get_inbox(self, value: str) -> schema.Instance | None:
+		# strip str subclasses from http frameworks so sqlite binds a plain string
+		value = str(value)
+
 		with self.run("get-inbox", {"value": value}) as cur:
 			return cur.one(schema.Instance)
 
@@ -148,6 +183,13 @@ class Connection(SqlConnection):
 		return self.execute("SELECT * FROM inboxes WHERE accepted = true").all(schema.Instance)
 
 
+	def get_inbox_domains(self) -> list[str]:
+		# the peer list only needs the domain, so don't drag every column
+		# through the driver
+		with self.execute("SELECT domain FROM inboxes WHERE accepted = true") as cur:
+			return [row["domain"] for row in cur]
+
+
 	# todo: check if software is different than stored row
 	def put_inbox(self, # noqa: E301
 				domain: str,
@@ -158,43 +200,30 @@ class Connection(SqlConnection):
 				accepted: bool = True) -> schema.Instance:
 
 		params: dict[str, Any] = {
+			"domain": domain,
 			"inbox": inbox,
 			"actor": actor,
 			"followid": followid,
 			"software": software,
-			"accepted": accepted
+			"accepted": accepted,
+			"created": datetime.now(tz = timezone.utc)
 		}
 
-		if self.get_inbox(domain) is None:
-			if not inbox:
-				raise ValueError("Missing inbox")
-
-			params["domain"] = domain
-			params["created"] = datetime.now(tz = timezone.utc)
-
-			with self.run("put-inbox", params) as cur:
-				if (row := cur.one(schema.Instance)) is None:
-					raise RuntimeError(f"Failed to insert instance: {domain}")
-
-				return row
-
-		for key, value in tuple(params.items()):
-			if value is None:
-				del params[key]
+		# the statement keeps existing column values when a parameter is null,
+		# so only an insert of a brand new row actually needs the inbox url
+		if inbox is None and self.get_inbox(domain) is None:
+			raise ValueError("Missing inbox")
 
-		with self.update("inboxes", params, domain = domain) as cur:
+		with self.run("put-inbox", params) as cur:
 			if (row := cur.one(schema.Instance)) is None:
-				raise RuntimeError(f"Failed to update instance: {domain}")
+				raise RuntimeError(f"Failed to insert instance: {domain}")
 
 			return row
 
 
 	def del_inbox(self, value: str) -> bool:
 		with self.run("del-inbox", {"value": value}) as cur:
-			if cur.row_count > 1:
-				raise ValueError("More than one row was modified")
-
-			return cur.row_count == 1
+			return cur.one() is not None
 
 
 	def get_request(self, domain: str) -> schema.Instance | None:
@@ -229,11 +258,15 @@ class Connection(SqlConnection):
 
 
 	def get_user(self, value: str) -> schema.User | None:
+		value = str(value)
+
 		with self.run("get-user", {"value": value}) as cur:
 			return cur.one(schema.User)
 
 
 	def get_user_by_token(self, token: str) -> schema.User | None:
+		token = str(token)
+
 		with self.run("get-user-by-token", {"token": token}) as cur:
 			return cur.one(schema.User)
 
@@ -282,9 +315,7 @@ class Connection(SqlConnection):
 		if (user := self.get_user(username)) is None:
 			raise KeyError(username)
 
-		with self.run("del-token-user", {"username": user.username}):
-			pass
-
+		# associated app rows are removed by the "user" foreign key
 		with self.run("del-user", {"username": user.username}):
 			pass
 
@@ -311,6 +342,8 @@ class Connection(SqlConnection):
 
 
 	def get_app_by_token(self, token: str) -> schema.App | None:
+		token = str(token)
+
 		with self.run("get-app-by-token", {"token": token}) as cur:
 			return cur.one(schema.App)
 
@@ -320,8 +353,8 @@ class Connection(SqlConnection):
 			"name": name,
 			"redirect_uri": redirect_uri,
 			"website": website,
-			"client_id": secrets.token_hex(20),
-			"client_secret": secrets.token_hex(20),
+			"client_id": secrets.token_urlsafe(24),
+			"client_secret": secrets.token_urlsafe(24),
 			"created": Date.new_utc(),
 			"accessed": Date.new_utc()
 		}
@@ -339,10 +372,10 @@ class Connection(SqlConnection):
 			"redirect_uri": "urn:ietf:wg:oauth:2.0:oob",
 			"website": None,
 			"user": user.username,
-			"client_id": secrets.token_hex(20),
-			"client_secret": secrets.token_hex(20),
+			"client_id": secrets.token_urlsafe(24),
+			"client_secret": secrets.token_urlsafe(24),
 			"auth_code": None,
-			"token": secrets.token_hex(20),
+			"token": secrets.token_urlsafe(24),
 			"created": Date.new_utc(),
 			"accessed": Date.new_utc()
 		}
@@ -361,10 +394,10 @@ class Connection(SqlConnection):
 			data["user"] = user.username
 
 		if set_auth:
-			data["auth_code"] = secrets.token_hex(20)
+			data["auth_code"] = secrets.token_urlsafe(24)
 
 		else:
-			data["token"] = secrets.token_hex(20)
+			data["token"] = secrets.token_urlsafe(24)
 			data["auth_code"] = None
 
 		params = {
@@ -400,6 +433,8 @@ class Connection(SqlConnection):
 
 
 	def get_domain_ban(self, domain: str) -> schema.DomainBan | None:
+		domain = str(domain)
+
 		if domain.startswith("http"):
 			domain = urlparse(domain).netloc
 
@@ -430,6 +465,19 @@ class Connection(SqlConnection):
 			return row
 
 
+	def put_domain_bans(self, bans: Iterable[tuple[str, str | None, str | None]]) -> None:
+		"Insert multiple (domain, reason, note) rows with a single statement"
+
+		created = datetime.now(tz = timezone.utc)
+		params = [
+			{"domain": domain, "reason": reason, "note": note, "created": created}
+			for domain, reason, note in bans
+		]
+
+		with self.cursor() as cur:
+			cur.execute_many(self.database.prepared_statements["put-domain-ban-many"], params)
+
+
 	def update_domain_ban(self,
 						domain: str,
 						reason: str | None = None,
@@ -461,10 +509,7 @@ class Connection(SqlConnection):
 
 	def del_domain_ban(self, domain: str) -> bool:
 		with self.run("del-domain-ban", {"domain": domain}) as cur:
-			if cur.row_count > 1:
-				raise ValueError("More than one row was modified")
-
-			return cur.row_count == 1
+			return cur.one() is not None
 
 
 	def get_software_ban(self, name: str) -> schema.SoftwareBan | None:
@@ -495,6 +540,19 @@ class Connection(SqlConnection):
 			return row
 
 
+	def put_software_bans(self, bans: Iterable[tuple[str, str | None, str | None]]) -> None:
+		"Insert multiple (name, reason, note) rows with a single statement"
+
+		created = datetime.now(tz = timezone.utc)
+		params = [
+			{"name": name, "reason": reason, "note": note, "created": created}
+			for name, reason, note in bans
+		]
+
+		with self.cursor() as cur:
+			cur.execute_many(self.database.prepared_statements["put-software-ban-many"], params)
+
+
 	def update_software_ban(self,
 						name: str,
 						reason: str | None = None,
@@ -526,10 +584,7 @@ class Connection(SqlConnection):
 
 	def del_software_ban(self, name: str) -> bool:
 		with self.run("del-software-ban", {"name": name}) as cur:
-			if cur.row_count > 1:
-				raise ValueError("More than one row was modified")
-
-			return cur.row_count == 1
+			return cur.one() is not None
 
 
 	def get_domain_whitelist(self, domain: str) -> schema.Whitelist | None:
@@ -554,9 +609,17 @@ class Connection(SqlConnection):
 			return row
 
 
+	def put_domain_whitelists(self, domains: Iterable[str]) -> None:
+		"Insert multiple whitelisted domains with a single statement"
+
+		created = datetime.now(tz = timezone.utc)
+		params = [{"domain": domain, "created": created} for domain in domains]
+
+		with self.cursor() as cur:
+			cur.execute_many(
+				self.database.prepared_statements["put-domain-whitelist-many"], params)
+
+
 	def del_domain_whitelist(self, domain: str) -> bool:
 		with self.run("del-domain-whitelist", {"domain": domain}) as cur:
-			if cur.row_count > 1:
-				raise ValueError("More than one row was modified")
-
-			return cur.row_count == 1
+			return cur.one() is not None
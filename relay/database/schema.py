@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 from blib import Date
-from bsql import Column, Row, Tables
-from collections.abc import Callable
+from bsql import Column, Row as SqlRow, Tables
+from collections.abc import Callable, Iterable
 from copy import deepcopy
 from datetime import timezone
 from typing import TYPE_CHECKING, Any
@@ -10,12 +10,25 @@ from typing import TYPE_CHECKING, Any
 from .config import ConfigData
 
 if TYPE_CHECKING:
+	from bsql.database import Cursor
+
 	from .connection import Connection
 
+	try:
+		from typing import Self
+
+	except ImportError:
+		from typing_extensions import Self
+
 
 VERSIONS: dict[int, Callable[[Connection], None]] = {}
 TABLES = Tables()
 
+INDEXES: tuple[str, ...] = (
+	"CREATE INDEX IF NOT EXISTS \"idx_inboxes_accepted\" ON \"inboxes\" (\"accepted\")",
+	"CREATE INDEX IF NOT EXISTS \"idx_apps_user\" ON \"apps\" (\"user\")"
+)
+
 
 def deserialize_timestamp(value: Any) -> Date:
 	try:
@@ -30,6 +43,18 @@ def deserialize_timestamp(value: Any) -> Date:
 	return date
 
 
+class Row(SqlRow):
+	# bsql rebuilds the field name tuple from the cursor description for every row,
+	# which adds up when iterating large result sets. Cache it on the cursor instead.
+	@classmethod
+	def from_cursor(cls: type[Self], cursor: Cursor, data: Iterable[Any]) -> Self:
+		if (fields := getattr(cursor, "_field_names", None)) is None:
+			fields = tuple(column.name for column in cursor.description)
+			cursor._field_names = fields # type: ignore[attr-defined]
+
+		return cls(dict(zip(fields, data)))
+
+
 @TABLES.add_row
 class Config(Row):
 	key: Column[str] = Column("key", "text", primary_key = True, unique = True, nullable = False)
@@ -112,7 +137,7 @@ class App(Row):
 	redirect_uri: Column[str] = Column("redirect_uri", "text", nullable = False)
 	token: Column[str | None] = Column("token", "text")
 	auth_code: Column[str | None] = Column("auth_code", "text")
-	user: Column[str | None] = Column("user", "text")
+	user: Column[str | None] = Column("user", "text", foreign_key = ("users", "username"))
 	created: Column[Date] = Column(
 		"created", "timestamp", nullable = False, deserializer = deserialize_timestamp)
 	accessed: Column[Date] = Column(
@@ -136,8 +161,14 @@ def migration(func: Callable[[Connection], None]) -> Callable[[Connection], None
 	return func
 
 
+def create_indexes(conn: Connection) -> None:
+	for query in INDEXES:
+		conn.execute(query).close()
+
+
 def migrate_0(conn: Connection) -> None:
 	conn.create_tables()
+	create_indexes(conn)
 	conn.put_config("schema-version", ConfigData.DEFAULT("schema-version"))
 
 
@@ -149,10 +180,28 @@ def migrate_20240206(conn: Connection) -> None:
 @migration
 def migrate_20240310(conn: Connection) -> None:
 	conn.execute("ALTER TABLE \"inboxes\" ADD COLUMN \"accepted\" BOOLEAN").close()
-	conn.execute("UPDATE \"inboxes\" SET \"accepted\" = true").close()
+	conn.execute("UPDATE \"inboxes\" SET \"accepted\" = true WHERE \"accepted\" IS NULL").close()
 
 
 @migration
 def migrate_20240625(conn: Connection) -> None:
 	conn.create_tables()
 	conn.execute("DROP TABLE \"tokens\"").close()
+
+
+@migration
+def migrate_20250901(conn: Connection) -> None:
+	conn.execute("ALTER TABLE \"apps\" RENAME TO \"apps_old\"").close()
+	conn.create_tables()
+
+	query = "DELETE FROM \"apps_old\" WHERE \"user\" IS NOT NULL"
+	query += " AND \"user\" NOT IN (SELECT \"username\" FROM \"users\")"
+
+	conn.execute(query).close()
+	conn.execute("INSERT INTO \"apps\" SELECT * FROM \"apps_old\"").close()
+	conn.execute("DROP TABLE \"apps_old\"").close()
+
+
+@migration
+def migrate_20250902(conn: Connection) -> None:
+	create_indexes(conn)
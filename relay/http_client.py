@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import orjson
+import time
 
 from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from multidict import CIMultiDict, CIMultiDictProxy
 from aputils import AlgorithmType, Nodeinfo, ObjectType, WellKnownNodeinfo
 from blib import HttpError, JsonBase
 from typing import TYPE_CHECKING, Any, TypeVar, overload
@@ -17,11 +20,29 @@ if TYPE_CHECKING:
 
 T = TypeVar("T", bound = JsonBase[Any])
 
-HEADERS = {
+# aiohttp keeps default headers as a CIMultiDict internally, so hand it one
+# pre-built instead of a plain dict it has to convert
+HEADERS = CIMultiDictProxy(CIMultiDict({
 	"Accept": f"{MIMETYPES['activity']}, {MIMETYPES['json']};q=0.9",
 	"User-Agent": f"ActivityRelay/{__version__}"
+}))
+
+# sign_headers copies this before adding anything, so sharing one dict is fine
+POST_HEADERS = {
+	"Content-Type": "application/activity+json"
 }
 
+NODEINFO_TTL = 60 * 60 * 24
+NODEINFO_CACHE_LIMIT = 4096
+
+# a busy relay re-fetches the same handful of instance actors for every inbox
+# post; keep recent bodies in memory so those don't even hit the cache backend
+MEM_CACHE_TTL = 300
+MEM_CACHE_LIMIT = 1024
+
+# no actor, nodeinfo, or activity document should come anywhere near this
+MAX_RESPONSE_SIZE = 10 * 1024 * 1024
+
 SUPPORTS_HS2019 = {
 	'friendica',
 	'gotosocial',
@@ -43,12 +64,21 @@ class EmptyBodyError(Exception):
 
 
 class HttpClient:
-	def __init__(self, state: State, limit: int = 100, timeout: int = 10):
+	def __init__(self,
+				state: State,
+				limit: int = 100,
+				limit_per_host: int = 4,
+				timeout: int = 10):
+
 		self.state: State = state
 		self.limit: int = limit
+		self.limit_per_host: int = limit_per_host
 		self.timeout: int = timeout
 		self._conn: TCPConnector | None = None
 		self._session: ClientSession | None = None
+		self._nodeinfo_cache: dict[str, tuple[float, Nodeinfo]] = {}
+		self._nodeinfo_inflight: dict[str, asyncio.Task[Nodeinfo]] = {}
+		self._mem_cache: dict[str, tuple[float, str]] = {}
 
 
 	async def __aenter__(self) -> HttpClient:
@@ -60,13 +90,19 @@ class HttpClient:
 		await self.close()
 
 
-	def open(self) -> None:
+	def open(self) -> ClientSession:
 		if self._session:
-			return
+			return self._session
 
+		# keep idle connections around long enough to survive the gaps between
+		# fanout bursts to the same instance, and cap per-host concurrency so a
+		# slow peer can't eat the whole pool
 		self._conn = TCPConnector(
 			limit = self.limit,
+			limit_per_host = self.limit_per_host,
 			ttl_dns_cache = 300,
+			keepalive_timeout = 75,
+			enable_cleanup_closed = True
 		)
 
 		self._session = ClientSession(
@@ -76,6 +112,8 @@ class HttpClient:
 			timeout = ClientTimeout(total=self.timeout)
 		)
 
+		return self._session
+
 
 	async def close(self) -> None:
 		if self._session:
@@ -88,26 +126,37 @@ class HttpClient:
 		self._session = None
 
 
+	def _remember(self, url: str, data: str) -> None:
+		if len(self._mem_cache) >= MEM_CACHE_LIMIT:
+			self._mem_cache.clear()
+
+		self._mem_cache[url] = (time.time(), data)
+
+
 	async def _get(self,
 					url: str,
 					sign_headers: bool,
 					force: bool,
 					old_algo: bool) -> str | None:
 
-		if not self._session:
-			raise RuntimeError("Client not open")
-
-		url = url.split("#", 1)[0]
+		session = self.open()
+		url = url.partition("#")[0]
 
 		if not force:
+			if (cached := self._mem_cache.get(url)) is not None:
+				if cached[0] + MEM_CACHE_TTL > time.time():
+					return cached[1]
+
 			try:
 				if not (item := self.state.cache.get("request", url)).older_than(48):
+					self._remember(url, item.value)
 					return item.value # type: ignore [no-any-return]
 
 			except KeyError:
 				logging.verbose("No cached data for url: %s", url)
 
-		headers = {}
+		# None makes aiohttp reuse the session defaults without a merge
+		headers = None
 
 		if sign_headers and self.state.signer is not None:
 			algo = AlgorithmType.RSASHA256 if old_algo else AlgorithmType.HS2019
@@ -115,22 +164,43 @@ class HttpClient:
 
 		logging.debug("Fetching resource: %s", url)
 
-		async with self._session.get(url, headers = headers) as resp:
+		async with session.get(url, headers = headers) as resp:
 			# Not expecting a response with 202s, so just return
 			if resp.status == 202:
 				return None
 
-			data = await resp.text()
+			# bail before buffering an absurdly large body into memory
+			if resp.content_length is not None and resp.content_length > MAX_RESPONSE_SIZE:
+				raise HttpError(413, f"response body too large: {resp.content_length} bytes")
+
+			# a chunked response carries no content-length, so enforce the cap
+			# while reading instead of trusting the header alone
+			size = 0
+			chunks = []
+
+			async for chunk in resp.content.iter_chunked(64 * 1024):
+				size += len(chunk)
+
+				if size > MAX_RESPONSE_SIZE:
+					raise HttpError(413, f"response body too large: over {MAX_RESPONSE_SIZE} bytes")
+
+				chunks.append(chunk)
+
+			# decode explicitly instead of using resp.text() so aiohttp doesn't
+			# run charset detection over every body
+			data = b"".join(chunks).decode("utf-8")
 
 		if resp.status not in (200, 202):
 			try:
-				error = json.loads(data)["error"]
+				error = orjson.loads(data)["error"]
 
 			except Exception:
 				error = data
 
 			raise HttpError(resp.status, error)
 
+		# a force fetch lands here too, which replaces any stale copy
+		self._remember(url, data)
 		self.state.cache.set("request", url, data, "str")
 		return data
 
@@ -176,8 +246,7 @@ class HttpClient:
 
 
 	async def post(self, url: str, data: Message | bytes, instance: Instance | None = None) -> None:
-		if not self._session:
-			raise RuntimeError("Client not open")
+		session = self.open()
 
 		if self.state.signer is None:
 			raise RuntimeError("Signer is not available")
@@ -189,29 +258,23 @@ class HttpClient:
 		else:
 			algorithm = AlgorithmType.RSASHA256
 
-		body: bytes
-		message: Message
-
-		if isinstance(data, bytes):
-			body = data
-			message = Message.parse(data)
+		body: bytes = data if isinstance(data, bytes) else data.to_json_bytes()
 
-		else:
-			body = data.to_json().encode("utf-8")
-			message = data
-
-		mtype = message.type.value if isinstance(message.type, ObjectType) else message.type
 		headers = self.state.signer.sign_headers(
 			"POST",
 			url,
 			body,
-			headers = {"Content-Type": "application/activity+json"},
+			headers = POST_HEADERS,
 			algorithm = algorithm
 		)
 
-		logging.verbose("Sending \"%s\" to %s", mtype, url)
+		# don't bother re-parsing the body for the log line unless it gets printed
+		if logging.get_level() <= logging.LogLevel.VERBOSE:
+			message = data if isinstance(data, Message) else Message.parse(data)
+			mtype = message.type.value if isinstance(message.type, ObjectType) else message.type
+			logging.verbose("Sending \"%s\" to %s", mtype, url)
 
-		async with self._session.post(url, headers = headers, data = body) as resp:
+		async with session.post(url, headers = headers, data = body) as resp:
 			if resp.status not in (200, 202):
 				raise HttpError(
 					resp.status,
@@ -221,19 +284,53 @@ class HttpClient:
 
 
 	async def fetch_nodeinfo(self, domain: str, force: bool = False) -> Nodeinfo:
-		nodeinfo_url = None
+		if not force:
+			try:
+				updated, nodeinfo = self._nodeinfo_cache[domain]
+
+				if updated + NODEINFO_TTL > time.time():
+					return nodeinfo
+
+			except KeyError:
+				pass
+
+		# coalesce concurrent lookups (follow storms trigger several for the
+		# same domain) into one request; a fetch that's already in flight is
+		# fresh enough even when force is set
+		if (task := self._nodeinfo_inflight.get(domain)) is not None:
+			return await task
+
+		task = asyncio.ensure_future(self._fetch_nodeinfo(domain, force))
+		self._nodeinfo_inflight[domain] = task
+
+		try:
+			return await task
+
+		finally:
+			del self._nodeinfo_inflight[domain]
+
+
+	async def _fetch_nodeinfo(self, domain: str, force: bool) -> Nodeinfo:
 		wk_nodeinfo = await self.get(
 			f"https://{domain}/.well-known/nodeinfo", False, WellKnownNodeinfo, force
 		)
 
-		for version in ("20", "21"):
+		# newest version first, stopping at the first one the instance offers
+		for version in ("21", "20"):
 			try:
 				nodeinfo_url = wk_nodeinfo.get_url(version)
+				break
 
 			except KeyError:
 				pass
 
-		if nodeinfo_url is None:
+		else:
 			raise ValueError(f"Failed to fetch nodeinfo url for {domain}")
 
-		return await self.get(nodeinfo_url, False, Nodeinfo, force)
+		nodeinfo = await self.get(nodeinfo_url, False, Nodeinfo, force)
+
+		if len(self._nodeinfo_cache) >= NODEINFO_CACHE_LIMIT:
+			self._nodeinfo_cache.clear()
+
+		self._nodeinfo_cache[domain] = (time.time(), nodeinfo)
+		return nodeinfo
@@ -33,11 +33,15 @@ def set_level(level: LogLevel | str) -> None:
 	logging.root.setLevel(LogLevel.parse(level))
 
 
-def verbose(message: str, *args: Any, **kwargs: Any) -> None:
-	if not logging.root.isEnabledFor(LogLevel.VERBOSE):
-		return
+# verbose gets called for every inbound activity, so cache the level int and
+# root logger instead of going through the enum and module helpers each time
+_VERBOSE = int(LogLevel.VERBOSE)
+_root = logging.root
+
 
-	logging.log(LogLevel.VERBOSE, message, *args, **kwargs)
+def verbose(message: str, *args: Any, **kwargs: Any) -> None:
+	if _root.isEnabledFor(_VERBOSE):
+		_root.log(_VERBOSE, message, *args, **kwargs)
 
 
 debug: LoggingMethod = logging.debug
@@ -65,9 +69,13 @@ else:
 	logging_format = "[%(asctime)s] %(levelname)s: %(message)s"
 
 logging.addLevelName(LogLevel.VERBOSE, "VERBOSE")
-logging.basicConfig(
-	level = LogLevel.INFO,
-	format = logging_format,
-	datefmt = "%Y-%m-%d %H:%M:%S",
-	handlers = handlers
-)
+
+# don't replace handlers (and re-open the log file) if something configured
+# logging before this module got imported
+if not logging.root.handlers:
+	logging.basicConfig(
+		level = LogLevel.INFO,
+		format = logging_format,
+		datefmt = "%Y-%m-%d %H:%M:%S",
+		handlers = handlers
+	)
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
 import aputils
-import json
+import orjson
 import os
 import platform
 
 from aiohttp.web import Request, Response as AiohttpResponse
 from collections.abc import Sequence
 from datetime import datetime
+from functools import cached_property, lru_cache
 from typing import TYPE_CHECKING, Any, TypedDict, TypeVar, overload
-from uuid import uuid4
 
 if TYPE_CHECKING:
 	from .state import State
@@ -118,12 +118,29 @@ def utf_to_idna(string: str | None) -> str | None:
 	return string.encode("utf-8").decode("idna")
 
 
-class JsonEncoder(json.JSONEncoder):
-	def default(self, o: Any) -> str:
-		if isinstance(o, datetime):
-			return o.isoformat()
+def _activity_id(prefix: str) -> str:
+	# nothing validates these beyond uniqueness, so skip the UUID object
+	# construction and format the random bytes directly
+	rand = os.urandom(16).hex()
+	return f"{prefix}{rand[:8]}-{rand[8:12]}-{rand[12:16]}-{rand[16:20]}-{rand[20:]}"
 
-		return json.JSONEncoder.default(self, o) # type: ignore[no-any-return]
+
+@lru_cache(maxsize = 64)
+def _host_urls(host: str) -> tuple[str, str, str]:
+	"Pre-formatted (actor, followers, activity prefix) urls for a host"
+
+	return (
+		f"https://{host}/actor",
+		f"https://{host}/followers",
+		f"https://{host}/activities/"
+	)
+
+
+def handle_dump_value(o: Any) -> str:
+	if isinstance(o, datetime):
+		return o.isoformat()
+
+	raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
 
 
 class Message(aputils.Message):
@@ -158,49 +175,88 @@ class Message(aputils.Message):
 
 	@classmethod
 	def new_announce(cls: type[Self], host: str, obj: str | dict[str, Any]) -> Self:
+		actor_url, followers_url, activity_prefix = _host_urls(host)
+
 		return cls.new(aputils.ObjectType.ANNOUNCE, {
-			"id": f"https://{host}/activities/{uuid4()}",
-			"to": [f"https://{host}/followers"],
-			"actor": f"https://{host}/actor",
+			"id": _activity_id(activity_prefix),
+			"to": [followers_url],
+			"actor": actor_url,
 			"object": obj
 		})
 
 
 	@classmethod
 	def new_follow(cls: type[Self], host: str, actor: str) -> Self:
+		actor_url, _, activity_prefix = _host_urls(host)
+
 		return cls.new(aputils.ObjectType.FOLLOW, {
-			"id": f"https://{host}/activities/{uuid4()}",
+			"id": _activity_id(activity_prefix),
 			"to": [actor],
 			"object": actor,
-			"actor": f"https://{host}/actor"
+			"actor": actor_url
 		})
 
 
 	@classmethod
 	def new_unfollow(cls: type[Self], host: str, actor: str, follow: dict[str, str] | str) -> Self:
+		actor_url, _, activity_prefix = _host_urls(host)
+
 		return cls.new(aputils.ObjectType.UNDO, {
-			"id": f"https://{host}/activities/{uuid4()}",
+			"id": _activity_id(activity_prefix),
 			"to": [actor],
-			"actor": f"https://{host}/actor",
+			"actor": actor_url,
 			"object": follow
 		})
 
 
 	@classmethod
 	def new_response(cls: type[Self], host: str, actor: str, followid: str, accept: bool) -> Self:
+		actor_url, _, activity_prefix = _host_urls(host)
+
 		return cls.new(aputils.ObjectType.ACCEPT if accept else aputils.ObjectType.REJECT, {
-			"id": f"https://{host}/activities/{uuid4()}",
+			"id": _activity_id(activity_prefix),
 			"to": [actor],
-			"actor": f"https://{host}/actor",
+			"actor": actor_url,
 			"object": {
 				"id": followid,
 				"type": "Follow",
-				"object": f"https://{host}/actor",
+				"object": actor_url,
 				"actor": actor
 			}
 		})
 
 
+	@cached_property
+	def domain(self) -> str:
+		# aputils runs urlparse on every access; messages don't change once
+		# parsed, so cache the result on first read
+		return aputils.Message.domain.fget(self) # type: ignore[attr-defined,no-any-return]
+
+
+	@cached_property
+	def object_domain(self) -> str:
+		# same reasoning as domain above
+		return aputils.Message.object_domain.fget(self) # type: ignore[attr-defined,no-any-return]
+
+
+	@cached_property
+	def object_type(self) -> str | None:
+		if isinstance((obj := self.get("object")), dict):
+			return obj.get("type")
+
+		return None
+
+
+	def to_json_bytes(self) -> bytes:
+		# the same activity gets delivered to every inbox during fanout, so
+		# serialize it once and reuse the encoded body
+		if (body := getattr(self, "_json_bytes", None)) is None:
+			body = orjson.dumps(self, default = self.handle_value_dump)
+			self._json_bytes: bytes = body
+
+		return body
+
+
 class Response(AiohttpResponse):
 	# AiohttpResponse.__len__ method returns 0, so bool(response) always returns False
 	def __bool__(self) -> bool:
@@ -229,7 +285,7 @@ class Response(AiohttpResponse):
 			kwargs["body"] = body
 
 		elif isinstance(body, (dict, Sequence)):
-			kwargs["text"] = json.dumps(body, cls = JsonEncoder)
+			kwargs["body"] = orjson.dumps(body, default = handle_dump_value)
 
 		return cls(**kwargs)
 
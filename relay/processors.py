@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+
 from typing import TYPE_CHECKING, cast
 
 from . import logger as logging
@@ -12,15 +14,62 @@ if TYPE_CHECKING:
 	from .views.activitypub import InboxData
 
 
+PERSON_ACTOR_SOFTWARE = frozenset({"akkoma", "pleroma"})
+VICE_ACTOR_SOFTWARE = frozenset({"gotosocial", "mitra"})
+
+
+class DedupCache:
+	"""
+		Fixed-capacity set of recently handled activity ids, so repeat
+		deliveries skip the cache backend round trip. Dicts keep insertion
+		order, which gives oldest-first eviction for free, and entries expire
+		after a day so an id ages out predictably instead of depending on
+		traffic volume. Ids only get added after the activity was pushed, so a
+		failure part way through stays retryable.
+	"""
+
+	__slots__ = ("_items", "_maxsize", "_ttl")
+
+
+	def __init__(self, maxsize: int = 1024, ttl: int = 60 * 60 * 24) -> None:
+		self._items: dict[str, float] = {}
+		self._maxsize: int = maxsize
+		self._ttl: int = ttl
+
+
+	def seen(self, key: str) -> bool:
+		if (expires := self._items.get(key)) is not None and expires > time.monotonic():
+			return True
+
+		return False
+
+
+	def add(self, key: str) -> None:
+		items = self._items
+
+		# drop any stale entry first so re-insertion lands at the back of the
+		# eviction order
+		items.pop(key, None)
+		items[key] = time.monotonic() + self._ttl
+
+		if len(items) > self._maxsize:
+			del items[next(iter(items))]
+
+
+DEDUP = DedupCache()
+
+
 def is_application(actor: Message, software: str | None) -> bool:
 	if actor.type == "Application":
 		return True
 
-	# akkoma (< 3.6.0) and pleroma use Person for the actor type
-	if software in {"akkoma", "pleroma"} and actor.id == f"https://{actor.domain}/relay":
-		return True
+	# akkoma (< 3.6.0) and pleroma use Person for the actor type; the cheap
+	# endswith check avoids building the comparison url for everyone else
+	if software in PERSON_ACTOR_SOFTWARE and actor.id.endswith("/relay"):
+		if actor.id == f"https://{actor.domain}/relay":
+			return True
 
-	if software in {"gotosocial", "mitra"} and actor.preferred_username == "vice_instance_actor":
+	if software in VICE_ACTOR_SOFTWARE and actor.preferred_username == "vice_instance_actor":
 		# Hack for GtS and Mitra due to no native relay support
 		return True
 
@@ -28,6 +77,10 @@ def is_application(actor: Message, software: str | None) -> bool:
 
 
 async def handle_relay(state: State, data: InboxData, conn: Connection) -> None:
+	if DEDUP.seen(data.message.object_id):
+		logging.verbose("already relayed %s", data.message.object_id)
+		return
+
 	try:
 		state.cache.get("handle-relay", data.message.object_id)
 		logging.verbose("already relayed %s", data.message.object_id)
@@ -39,13 +92,16 @@ async def handle_relay(state: State, data: InboxData, conn: Connection) -> None:
 	message = Message.new_announce(state.config.domain, data.message.object_id)
 	logging.debug(">> relay: %s", message)
 
-	for instance in conn.distill_inboxes(data.message):
-		state.push_message(instance.inbox, message, instance)
-
+	state.push_messages(conn.distill_inboxes(data.message), message)
 	state.cache.set("handle-relay", data.message.object_id, message.id, "str")
+	DEDUP.add(data.message.object_id)
 
 
 async def handle_forward(state: State, data: InboxData, conn: Connection) -> None:
+	if DEDUP.seen(data.message.id):
+		logging.verbose("already forwarded %s", data.message.id)
+		return
+
 	try:
 		state.cache.get("handle-relay", data.message.id)
 		logging.verbose("already forwarded %s", data.message.id)
@@ -57,10 +113,9 @@ async def handle_forward(state: State, data: InboxData, conn: Connection) -> Non
 	message = Message.new_announce(state.config.domain, data.message)
 	logging.debug(">> forward: %s", message)
 
-	for instance in conn.distill_inboxes(data.message):
-		state.push_message(instance.inbox, data.message, instance)
-
+	state.push_messages(conn.distill_inboxes(data.message), data.message)
 	state.cache.set("handle-relay", data.message.id, message.id, "str")
+	DEDUP.add(data.message.id)
 
 
 async def handle_follow(state: State, data: InboxData, conn: Connection) -> None:
@@ -175,7 +230,7 @@ async def handle_follow(state: State, data: InboxData, conn: Connection) -> None
 
 
 async def handle_undo(state: State, data: InboxData, conn: Connection) -> None:
-	if data.message.object["type"] != "Follow":
+	if data.message.object_type != "Follow":
 		# forwarding deletes does not work, so don"t bother
 		# await handle_forward(state, data, conn)
 		return
@@ -217,7 +272,7 @@ processors = {
 
 
 async def run_processor(data: InboxData) -> None:
-	if data.message.type not in processors:
+	if (processor := processors.get(data.message.type)) is None:
 		logging.verbose(
 			"Message type \"%s\" from actor cannot be handled: %s",
 			data.message.type,
@@ -246,4 +301,4 @@ async def run_processor(data: InboxData) -> None:
 					)
 
 		logging.verbose("New \"%s\" from actor: %s", data.message.type, data.actor.id)
-		await processors[data.message.type](state, data, conn)
+		await processor(state, data, conn)
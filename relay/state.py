@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import os
+
 from aputils import Signer
 from asyncio import Event, get_running_loop, sleep
 from blib import File, Path, set_signal_handler
 from bsql import Database
+from collections.abc import Iterable
 from datetime import datetime, timedelta
 from mimetypes import guess_type
 from typing import Any
@@ -107,6 +110,10 @@ class State:
 		self.workers.push_message(inbox, message, instance)
 
 
+	def push_messages(self, targets: Iterable[Instance], message: Message) -> None:
+		self.workers.push_messages(targets, message)
+
+
 	async def handle_start(self) -> None:
 		if not self.shutdown.is_set():
 			return
@@ -132,13 +139,15 @@ class State:
 		for method, path, handler in ROUTES:
 			app.router.add_route(method, path, handler)
 
-			if self.dev:
-				static = StaticResource("/static", File.from_resource("relay", "frontend/static"))
+		# this was getting built (and for the cached variant, every static file
+		# read) once per route instead of once per app
+		if self.dev:
+			static = StaticResource("/static", File.from_resource("relay", "frontend/static"))
 
-			else:
-				static = CachedStaticResource("/static", File.from_resource("relay", "frontend/static"))
+		else:
+			static = CachedStaticResource("/static", File.from_resource("relay", "frontend/static"))
 
-			app.router.register_resource(static)
+		app.router.register_resource(static)
 
 		runner = AppRunner(
 			app, access_log_format = "%{X-Forwarded-For}i \"%r\" %s %b \"%{User-Agent}i\""
@@ -155,7 +164,6 @@ class State:
 
 		await site.start()
 		self.workers.start()
-		self.client.open()
 
 		self.startup_time = datetime.now()
 		loop = get_running_loop()
@@ -187,15 +195,26 @@ class CachedStaticResource(StaticResource):
 
 		self.cache: dict[str, bytes] = {}
 
-		for filename in path.glob(recursive = True):
-			if filename.isdir:
-				continue
+		# walk with scandir so file type checks come from the dirent instead of
+		# a stat call per path
+		root = str(path)
+		dirs = [root]
+
+		while dirs:
+			with os.scandir(dirs.pop()) as listing:
+				for entry in listing:
+					if entry.is_dir(follow_symlinks = False):
+						dirs.append(entry.path)
+						continue
+
+					if not entry.is_file(follow_symlinks = False):
+						continue
 
-			rel_path = filename.relative_to(path)
+					rel_path = os.path.relpath(entry.path, root).replace(os.sep, "/")
 
-			with filename.open("rb") as fd:
-				logging.debug("Loading static resource \"%s\"", rel_path)
-				self.cache[str(rel_path)] = fd.read()
+					with open(entry.path, "rb") as fd:
+						logging.debug("Loading static resource \"%s\"", rel_path)
+						self.cache[rel_path] = fd.read()
 
 
 	async def _handle(self, request: Request) -> StreamResponse:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import textwrap
+import time
 
 from aiohttp.web import Request
 from blib import File
@@ -16,9 +17,13 @@ from typing import TYPE_CHECKING, Any
 from . import __version__
 
 if TYPE_CHECKING:
+	from .database.config import ConfigData
 	from .state import State
 
 
+CONFIG_TTL = 5
+
+
 class Template(Environment):
 	render_markdown: Callable[[str], str]
 	hamlish: HamlishSettings
@@ -29,6 +34,9 @@ class Template(Environment):
 			autoescape = True,
 			trim_blocks = True,
 			lstrip_blocks = True,
+			# without this, jinja stats the template file on every render to see
+			# if it changed; the dev watcher restarts the process on edits anyway
+			auto_reload = False,
 			extensions = [
 				HamlishExtension,
 				MarkdownExtension
@@ -40,11 +48,18 @@ class Template(Environment):
 		)
 
 		self.state = state
+		self._config_cache: tuple[float, ConfigData] | None = None
 
 
 	def render(self, path: str, request: Request, **context: Any) -> str:
-		with self.state.database.session(False) as conn:
-			config = conn.get_config_all()
+		# every page render was fetching the whole config table; admin edits are
+		# rare enough that a few seconds of staleness is a fair trade for
+		# skipping the query on each request
+		if self._config_cache is None or self._config_cache[0] + CONFIG_TTL < time.monotonic():
+			with self.state.database.session(False) as conn:
+				self._config_cache = (time.monotonic(), conn.get_config_all())
+
+		config = self._config_cache[1]
 
 		new_context = {
 			"request": request,
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import aputils
-import traceback
+import time
 
 from aiohttp import ClientConnectorError
 from aiohttp.web import Request
 from aputils import Signature, SignatureFailureError, Signer
 from blib import HttpError, HttpMethod
 from dataclasses import dataclass
+from hashlib import sha256
 from typing import TYPE_CHECKING
+from urllib.parse import urlparse
 
 from .base import register_route
 
@@ -27,6 +29,18 @@ if TYPE_CHECKING:
 		from typing_extensions import Self
 
 
+# activities regularly arrive more than once (retries, multiple relay paths),
+# and each delivery costs an rsa verify. a signature that already checked out
+# against the same key and body doesn't need the math redone, so remember it
+# for a few minutes. entries only get added after a successful verification,
+# and the body hash is computed here rather than trusted from the digest
+# header, so a hit proves this exact body was verified against this key.
+SIG_CACHE_TTL = 300
+SIG_CACHE_LIMIT = 4096
+
+_verified_sigs: dict[tuple[str, str, str], float] = {}
+
+
 @dataclass(slots = True)
 class InboxData:
 	signature: Signature
@@ -43,24 +57,24 @@ class InboxData:
 		actor: Message | None = None
 		signer: Signer | None = None
 
-		try:
-			signature = Signature.parse(request.headers["signature"])
-
-		except KeyError:
+		if (sig_header := request.headers.get("signature")) is None:
 			logging.verbose("Missing signature header")
 			raise HttpError(400, "missing signature header")
 
+		signature = Signature.parse(sig_header)
+
 		try:
-			message = await request.json(loads = Message.parse)
+			# parse the raw bytes directly; request.json would decode them to a
+			# str first, and the signature validator reuses the same buffer via
+			# request.read() anyway
+			message = Message.parse(await request.read())
 
 		except Exception:
-			traceback.print_exc()
-			logging.verbose("Failed to parse message from actor: %s", signature.keyid)
-			raise HttpError(400, "failed to parse message")
+			logging.verbose(
+				"Failed to parse message from actor: %s", signature.keyid, exc_info = True
+			)
 
-		if message is None:
-			logging.verbose("empty message")
-			raise HttpError(400, "missing message")
+			raise HttpError(400, "failed to parse message")
 
 		if "actor" not in message:
 			logging.verbose("actor not in message")
@@ -92,7 +106,7 @@ class InboxData:
 			raise HttpError(400, "failed to fetch actor")
 
 		except Exception:
-			traceback.print_exc()
+			logging.error("Error when fetching actor: %s", signature.keyid, exc_info = True)
 			raise HttpError(500, "unexpected error when fetching actor")
 
 		try:
@@ -102,13 +116,32 @@ class InboxData:
 			logging.verbose("Actor missing public key: %s", signature.keyid)
 			raise HttpError(400, "actor missing public key")
 
+		body_hash = sha256(await request.read()).hexdigest()
+		sig_key = (signature.keyid, sig_header, body_hash)
+
+		if (verified := _verified_sigs.get(sig_key)) is not None:
+			if verified + SIG_CACHE_TTL > time.monotonic():
+				return cls(signature, message, actor, signer, None)
+
 		try:
 			await signer.validate_request_async(request)
 
 		except SignatureFailureError as e:
-			logging.verbose("signature validation failed for \"%s\": %s", actor.id, e)
-			raise HttpError(401, str(e))
+			# the instance may have rotated its key since the actor got cached,
+			# so refetch it once and retry before rejecting
+			try:
+				actor = await state.client.get(actor_id, True, Message, force = True)
+				signer = actor.signer
+				await signer.validate_request_async(request)
+
+			except (SignatureFailureError, KeyError, HttpError, ClientConnectorError):
+				logging.verbose("signature validation failed for \"%s\": %s", actor.id, e)
+				raise HttpError(401, str(e))
+
+		if len(_verified_sigs) >= SIG_CACHE_LIMIT:
+			_verified_sigs.clear()
 
+		_verified_sigs[sig_key] = time.monotonic()
 		return cls(signature, message, actor, signer, None)
 
 
@@ -145,6 +178,22 @@ async def handle_actor(state: State, request: Request) -> Response:
 
 @register_route(HttpMethod.POST, "/actor", "/inbox")
 async def handle_inbox(state: State, request: Request) -> Response:
+	# a banned instance hammering the inbox would otherwise get a body parse,
+	# an actor fetch, and a signature check per request, so peek at the keyid
+	# domain and bail first; it's unverified here, which is fine for a reject
+	if (sig_header := request.headers.get("signature")) is not None:
+		try:
+			keyid_domain = urlparse(Signature.parse(sig_header).keyid).netloc
+
+		except Exception:
+			keyid_domain = ""
+
+		if keyid_domain:
+			with state.database.session(False) as conn:
+				if conn.get_domain_ban(keyid_domain):
+					logging.verbose("Ignored request from banned actor: %s", keyid_domain)
+					raise HttpError(403, "access denied")
+
 	data = await InboxData.parse(state, request)
 
 	with state.database.session() as conn:
@@ -164,7 +213,9 @@ async def handle_inbox(state: State, request: Request) -> Response:
 
 			raise HttpError(401, "access denied")
 
-	logging.debug(">> payload %s", data.message.to_json(4))
+	# pretty-printing the payload isn't free, so skip it unless it gets logged
+	if logging.get_level() <= logging.LogLevel.DEBUG:
+		logging.debug(">> payload %s", data.message.to_json(4))
 
 	await run_processor(data)
 	return Response.new(status = 202)
@@ -38,6 +38,13 @@ ALLOWED_HEADERS: set[str] = {
 	"content-type"
 }
 
+# every api response carries the same cors headers, so build the dict once;
+# aiohttp copies it into each response
+CORS_HEADERS: dict[str, str] = {
+	"Access-Control-Allow-Origin": "*",
+	"Access-Control-Allow-Headers": ", ".join(ALLOWED_HEADERS)
+}
+
 
 def parse_docstring(docstring: str) -> tuple[str, dict[str, str]]:
 	params = {}
@@ -63,7 +70,11 @@ def register_route(
 
 	def wrapper(handler: RouteHandler) -> HandlerCallback:
 		async def inner(request: Request) -> Response:
-			return await handler(get_state(), request, **request.match_info)
+			# most routes have no path params, so skip the kwargs splat
+			if not (match_info := request.match_info):
+				return await handler(get_state(), request)
+
+			return await handler(get_state(), request, **match_info)
 
 		for path in paths:
 			ROUTES.append((HttpMethod.parse(method), path, inner))
@@ -107,7 +118,7 @@ class Method:
 		params = []
 
 		if func.__doc__ is None:
-			logging.warning(f"Missing docstring for \"{func.__name__}\"")
+			logging.warning("Missing docstring for \"%s\"", func.__name__)
 
 		for key, value in args.items():
 			types: list[type[Any]] = []
@@ -134,7 +145,7 @@ class Method:
 			))
 
 			if not paramdocs.get(key):
-				logging.warning(f"Missing docs for \"{key}\" parameter in \"{func.__name__}\"")
+				logging.warning("Missing docs for \"%s\" parameter in \"%s\"", key, func.__name__)
 
 		rtype = annotations.get("return") or type(None)
 		return cls(func.__name__, category, docstring, method, path, rtype, tuple(params))
@@ -264,17 +275,12 @@ class Route:
 		except HttpError as error:
 			return Response.new({"error": error.message}, error.status, ctype = "json")
 
-		headers = {
-			"Access-Control-Allow-Origin": "*",
-			"Access-Control-Allow-Headers": ", ".join(ALLOWED_HEADERS)
-		}
-
 		if isinstance(response, StreamResponse):
-			response.headers.update(headers)
+			response.headers.update(CORS_HEADERS)
 			return response
 
 		if isinstance(response, ApiObject):
-			return Response.new(response.to_json(), headers = headers, ctype = "json")
+			return Response.new(response.to_json(), headers = CORS_HEADERS, ctype = "json")
 
 		if isinstance(response, list):
 			data = []
@@ -285,4 +291,4 @@ class Route:
 
 			response = data
 
-		return Response.new(response, headers = headers, ctype = "json")
+		return Response.new(response, headers = CORS_HEADERS, ctype = "json")
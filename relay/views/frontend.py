@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+
 from aiohttp.web import Request
 from blib import HttpMethod
 from typing import TYPE_CHECKING, Any
@@ -12,15 +14,28 @@ from ..logger import LogLevel
 from ..misc import Response
 
 if TYPE_CHECKING:
+	from ..database import schema
 	from ..application import Application
 
 
+# the rendered page can't be cached wholesale since every response carries a
+# fresh csp nonce, but the instance table backing it can be
+INSTANCES_TTL = 60
+
+_instances_cache: tuple[float, tuple[schema.Instance, ...]] | None = None
+
+
 @register_route(HttpMethod.GET, "/")
 async def handle_home(app: Application, request: Request) -> Response:
-	with app.database.session() as conn:
-		context: dict[str, Any] = {
-			"instances": tuple(conn.get_inboxes())
-		}
+	global _instances_cache
+
+	if _instances_cache is None or _instances_cache[0] + INSTANCES_TTL < time.monotonic():
+		with app.database.session() as conn:
+			_instances_cache = (time.monotonic(), tuple(conn.get_inboxes()))
+
+	context: dict[str, Any] = {
+		"instances": _instances_cache[1]
+	}
 
 	return Response.new_template(200, "page/home.haml", request, context)
 
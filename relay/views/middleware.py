@@ -1,3 +1,4 @@
+import orjson
 import traceback
 
 from Crypto.Random import get_random_bytes
@@ -5,6 +6,7 @@ from aiohttp.web import HTTPException, Request, StreamResponse, middleware
 from base64 import b64encode
 from blib import HttpError
 from collections.abc import Awaitable, Callable
+from functools import lru_cache
 
 from ..misc import JSON_PATHS, TOKEN_PATHS, Response, get_state
 from ..state import State
@@ -26,9 +28,16 @@ def get_csp(state: State, request: Request) -> str:
 	return "; ".join(data) + ";"
 
 
+# the same handful of stock messages ("access denied", "missing signature
+# header", ...) cover nearly every error, so keep their encoded bodies around
+@lru_cache(maxsize = 64)
+def encode_error(message: str) -> bytes:
+	return orjson.dumps({"error": message})
+
+
 def format_error(request: Request, error: HttpError) -> Response:
 	if request.path.startswith(JSON_PATHS) or "json" in request.headers.get("accept", ""):
-		return Response.new({"error": error.message}, error.status, ctype = "json")
+		return Response.new(encode_error(error.message), error.status, ctype = "json")
 
 	else:
 		context = {"e": error}
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import aputils
-import subprocess
+import time
 
 from aiohttp.web import Request
 from blib import File, HttpMethod
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 from .base import register_route
@@ -16,18 +17,23 @@ if TYPE_CHECKING:
 	from ..application import Application
 
 
-VERSION = __version__
+@lru_cache(maxsize = 1)
+def get_version() -> str:
+	# only dev checkouts have a .git directory, so don't fork a git process at
+	# import time; the first nodeinfo request pays the cost once instead
+	if File(__file__).join("../../../.git").resolve().exists:
+		import subprocess
 
+		try:
+			commit_label = subprocess.check_output(
+				["git", "rev-parse", "HEAD"]).strip().decode("ascii")
 
-if File(__file__).join("../../../.git").resolve().exists:
-	try:
-		commit_label = subprocess.check_output(["git", "rev-parse", "HEAD"]).strip().decode("ascii")
-		VERSION = f"{__version__} {commit_label}"
+			return f"{__version__} {commit_label}"
 
-		del commit_label
+		except Exception:
+			pass
 
-	except Exception:
-		pass
+	return __version__
 
 
 NODEINFO_PATHS = [
@@ -35,22 +41,31 @@ NODEINFO_PATHS = [
 	"/nodeinfo/{niversion:\\d.\\d}"
 ]
 
+# nodeinfo gets crawled constantly and the peer list moves slowly, so serve a
+# copy that's at most a minute old instead of querying per hit
+PEERS_TTL = 60
+
+_peers_cache: tuple[float, list[str]] | None = None
+
 
 @register_route(HttpMethod.GET, *NODEINFO_PATHS) # type: ignore[arg-type]
 async def handle_nodeinfo(app: Application, request: Request, niversion: str) -> Response:
+	global _peers_cache
+
 	with app.database.session() as conn:
-		inboxes = conn.get_inboxes()
+		if _peers_cache is None or _peers_cache[0] + PEERS_TTL < time.monotonic():
+			_peers_cache = (time.monotonic(), conn.get_inbox_domains())
 
 		nodeinfo = aputils.Nodeinfo.new(
 			name = "activityrelay",
-			version = VERSION,
+			version = get_version(),
 			protocols = ["activitypub"],
 			open_regs = not conn.get_config("whitelist-enabled"),
 			users = 1,
 			repo = "https://git.pleroma.social/pleroma/relay" if niversion == "2.1" else None,
 			metadata = {
 				"approval_required": conn.get_config("approval-required"),
-				"peers": [inbox["domain"] for inbox in inboxes]
+				"peers": _peers_cache[1]
 			}
 		)
 
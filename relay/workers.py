@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import asyncio
-import traceback
 
 from aiohttp.client_exceptions import ClientConnectionError, ClientSSLError
 from asyncio.exceptions import TimeoutError as AsyncTimeoutError
 from blib import File, HttpError
 from dataclasses import dataclass
+from functools import cached_property
 from multiprocessing import Event, Process, Queue, Value
 from multiprocessing.queues import Queue as QueueType
 from multiprocessing.sharedctypes import Synchronized
 from multiprocessing.synchronize import Event as EventType
+from collections.abc import Iterable
 from queue import Empty
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
@@ -26,10 +27,12 @@ if TYPE_CHECKING:
 @dataclass
 class PostItem:
 	inbox: str
-	message: Message
+	message: bytes
 	instance: Instance | None
 
-	@property
+	# the error handlers can hit this several times for one item, so only
+	# parse the inbox url once
+	@cached_property
 	def domain(self) -> str:
 		return urlparse(self.inbox).netloc
 
@@ -53,6 +56,14 @@ class PushWorker(Process):
 
 
 	def run(self) -> None:
+		# worker processes don't inherit the policy set in relay.cli when spawned
+		try:
+			import uvloop
+			asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+		except ImportError:
+			pass
+
 		asyncio.run(self.handle_queue())
 
 
@@ -77,7 +88,7 @@ class PushWorker(Process):
 				await asyncio.sleep(0)
 
 			except Exception:
-				traceback.print_exc()
+				logging.error("Error while processing queue item", exc_info = True)
 
 		await self.state.close()
 
@@ -107,7 +118,16 @@ class PushWorkers(list[PushWorker]):
 
 
 	def push_message(self, inbox: str, message: Message, instance: Instance) -> None:
-		self.queue.put(PostItem(inbox, message, instance))
+		# to_json_bytes caches the encoded body on the message, so a fanout
+		# serializes the activity once and the queue only has to pickle bytes
+		self.queue.put(PostItem(inbox, message.to_json_bytes(), instance))
+
+
+	def push_messages(self, targets: Iterable[Instance], message: Message) -> None:
+		body = message.to_json_bytes()
+
+		for instance in targets:
+			self.queue.put(PostItem(instance.inbox, body, instance))
 
 
 	def set_log_level(self, value: logging.LogLevel) -> None: